@@ -1,49 +1,86 @@
-import json
+import asyncio
 import logging
 from typing import Dict, Any
 
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST, require_GET
+import orjson
 
-from backend.agentcore.http import api_get
+from django.http import HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from backend.agentcore.cache import cached
+from backend.agentcore.http_async import api_get_async
+from backend.agentcore.responses import OrjsonResponse
 from backend.agentcore.security import verify_secret_or_401
 
 logger = logging.getLogger(__name__)
 
-def _ok(data: Dict[str, Any], utterance: str = "") -> JsonResponse:
-    return JsonResponse({"data": data, "utterance": utterance})
+def _ok(data: Dict[str, Any], utterance: str = "") -> OrjsonResponse:
+    return OrjsonResponse({"data": data, "utterance": utterance})
+
+def _bad_request(msg: str, code: int = 400) -> OrjsonResponse:
+    return OrjsonResponse({"error": msg, "utterance": msg}, status=code)
+
+def _error_body(msg: str) -> bytes:
+    return orjson.dumps({"error": msg, "utterance": msg})
+
+# Validation errors with fixed text are serialized once at import;
+# each call still gets a fresh HttpResponse since responses are stateful.
+ERR_NEED_CITY = _error_body("Please provide a city or ZIP (e.g., 'Norfolk, VA' or '24060').")
+ERR_NEED_BOUNDS = _error_body("Please provide map bounds: 'sw' and 'ne' as 'lat,lng'.")
+ERR_BAD_CALLS = _error_body("'calls' must be a non-empty list of tool calls.")
+ERR_INVALID_JSON = _error_body("Invalid JSON body.")
+ERR_BAD_PARAMS = _error_body("'params' must be an object.")
+# Batch entry for a call whose handler raised instead of answering.
+TOOL_FAILED = {"error": "Tool call failed.", "utterance": "Tool call failed."}
+
+def _static_bad_request(body: bytes, code: int = 400) -> HttpResponse:
+    return HttpResponse(body, content_type="application/json", status=code)
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
 
-def _bad_request(msg: str, code: int = 400) -> JsonResponse:
-    return JsonResponse({"error": msg, "utterance": msg}, status=code)
+async def _ndjson_lines(data: Dict[str, Any], utterance: str):
+    # header line, one line per result, then the utterance
+    results = data["results"]
+    yield orjson.dumps({"params": data["params"], "navigate": data["navigate"], "count": len(results)}) + b"\n"
+    for r in results:
+        yield orjson.dumps({"result": r}) + b"\n"
+    yield orjson.dumps({"utterance": utterance}) + b"\n"
+
+def _ok_search(data: Dict[str, Any], utterance: str, stream: bool = False):
+    """Search tool envelope: buffered JSON by default, NDJSON stream when requested."""
+    if stream:
+        return StreamingHttpResponse(_ndjson_lines(data, utterance), content_type=NDJSON_CONTENT_TYPE)
+    return _ok(data, utterance)
 
 # -------------------- Tool implementations --------------------
 
-def tool_search_text(params: Dict[str, Any]) -> JsonResponse:
+@cached(ttl_seconds=20)
+async def tool_search_text(params: Dict[str, Any], stream: bool = False):
     """
     Input:  { "tool": "search.text", "params": { "q": "Norfolk, VA" } }
     Calls:  GET /api/properties/search/?mode=text&q=...
     """
     q = (params.get("q") or "").strip()
     if not q:
-        return _bad_request("Please provide a city or ZIP (e.g., 'Norfolk, VA' or '24060').")
+        return _static_bad_request(ERR_NEED_CITY)
 
     try:
-        resp = api_get("/api/properties/search/", params={"mode": "text", "q": q})
+        resp = await api_get_async("/api/properties/search/", params={"mode": "text", "q": q})
         resp.raise_for_status()
-        payload = resp.json()
+        payload = orjson.loads(resp.content)
         results = payload.get("results", [])
         say = f"I found {len(results)} places near {q}. Showing them now." if results \
               else f"I couldn’t find places near {q}. Try another location."
-        return _ok(
+        return _ok_search(
             {"results": results, "params": {"mode": "text", "q": q}, "navigate": f"/dashboard?mode=text&q={q}"},
-            say
+            say, stream
         )
     except Exception as e:
         logger.exception("tool_search_text failed")
         return _bad_request(f"Search failed upstream: {e}", code=502)
 
-def tool_search_nearby(params: Dict[str, Any]) -> JsonResponse:
+@cached(ttl_seconds=15)
+async def tool_search_nearby(params: Dict[str, Any], stream: bool = False):
     """
     Input:  { "tool": "search.nearby", "params": { "sw": "lat,lng", "ne": "lat,lng" } }
     Calls:  GET /api/properties/search/?mode=nearby&sw=...&ne=...
@@ -51,36 +88,44 @@ def tool_search_nearby(params: Dict[str, Any]) -> JsonResponse:
     sw = (params.get("sw") or "").strip()
     ne = (params.get("ne") or "").strip()
     if not sw or not ne:
-        return _bad_request("Please provide map bounds: 'sw' and 'ne' as 'lat,lng'.")
+        return _static_bad_request(ERR_NEED_BOUNDS)
 
     try:
-        resp = api_get("/api/properties/search/", params={"mode": "nearby", "sw": sw, "ne": ne})
+        resp = await api_get_async("/api/properties/search/", params={"mode": "nearby", "sw": sw, "ne": ne})
         resp.raise_for_status()
-        payload = resp.json()
+        payload = orjson.loads(resp.content)
         results = payload.get("results", [])
         say = f"I found {len(results)} places in the current map area." if results else "No places in the current map area."
-        return _ok(
+        return _ok_search(
             {"results": results, "params": {"mode": "nearby", "sw": sw, "ne": ne}, "navigate": f"/dashboard?mode=nearby&sw={sw}&ne={ne}"},
-            say
+            say, stream
         )
     except Exception as e:
         logger.exception("tool_search_nearby failed")
         return _bad_request(f"Nearby search failed upstream: {e}", code=502)
 
-def tool_finance_affordability(params: Dict[str, Any]) -> JsonResponse:
+def _num(d: Dict[str, Any], k: str) -> float:
+    # JSON numbers usually arrive as float already; only convert otherwise.
+    v = d.get(k)
+    return v if type(v) is float else (float(v) if v else 0.0)
+
+async def tool_finance_affordability(params: Dict[str, Any]) -> OrjsonResponse:
     """
     Optional example tool: compute a recommended rent range inline.
     Input: { "tool": "finance.affordability", "params": { "incomeMonthly": 4000, "fixedDebtsMonthly": 300, "targetSavingsMonthly": 400 } }
     """
     try:
-        inc = float(params.get("incomeMonthly") or 0)
-        debts = float(params.get("fixedDebtsMonthly") or 0)
-        savings = float(params.get("targetSavingsMonthly") or 0)
+        inc = _num(params, "incomeMonthly")
+        debts = _num(params, "fixedDebtsMonthly")
+        savings = _num(params, "targetSavingsMonthly")
 
+        # rec_max = max(0, min(30% rule, 36% DTI cap, income after goals)), unrolled
         thirty = 0.30 * inc
-        dti_cap = max(0.0, 0.36 * inc - debts)
-        after_goal = max(0.0, inc - debts - savings)
-        rec_max = max(0.0, min(thirty, dti_cap, after_goal))
+        dti_cap = 0.36 * inc - debts
+        after_goal = inc - debts - savings
+        rec_max = thirty if thirty < dti_cap else dti_cap
+        rec_max = rec_max if rec_max < after_goal else after_goal
+        rec_max = rec_max if rec_max > 0.0 else 0.0
         rec_min = 0.8 * rec_max
 
         say = f"I recommend a rent of ${rec_min:,.0f}–${rec_max:,.0f} per month."
@@ -88,16 +133,66 @@ def tool_finance_affordability(params: Dict[str, Any]) -> JsonResponse:
     except Exception as e:
         return _bad_request(f"Affordability error: {e}", code=400)
 
-# Central registry for tools
+# Central registry for tools (introspection / error messages; keep _dispatch's match in sync)
 TOOL_REGISTRY = {
     "search.text": tool_search_text,
     "search.nearby": tool_search_nearby,
     "finance.affordability": tool_finance_affordability,
 }
-
-@csrf_exempt
-@require_POST
-def convai_tool_router(request):
+AVAILABLE_TOOLS_STR = ", ".join(TOOL_REGISTRY)
+UNKNOWN_TOOL_MSG = f"Unknown tool '%s'. Available: {AVAILABLE_TOOLS_STR}"
+# Tools that can answer with an NDJSON stream (handler accepts stream=True).
+STREAMING_TOOLS = frozenset({"search.text", "search.nearby"})
+
+# Upper bound on tool calls accepted in one batch POST.
+MAX_BATCH_CALLS = 16
+
+async def _dispatch(tool: str, params: Dict[str, Any], stream: bool = False):
+    match tool:
+        case "search.text":
+            handler = tool_search_text
+        case "search.nearby":
+            handler = tool_search_nearby
+        case "finance.affordability":
+            handler = tool_finance_affordability
+        case _:
+            return _bad_request(UNKNOWN_TOOL_MSG % tool)
+    if not isinstance(params, dict):
+        return _static_bad_request(ERR_BAD_PARAMS)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("tool_call name=%s params=%s", tool, params)
+    if stream and tool in STREAMING_TOOLS:
+        return await handler(params, stream=True)
+    return await handler(params)
+
+async def _dispatch_batch(calls: list) -> OrjsonResponse:
+    if not isinstance(calls, list) or not calls:
+        return _static_bad_request(ERR_BAD_CALLS)
+    if len(calls) > MAX_BATCH_CALLS:
+        return _bad_request(f"Too many calls in one batch (max {MAX_BATCH_CALLS}).")
+
+    names = []
+    coros = []
+    for call in calls:
+        call = call if isinstance(call, dict) else {}
+        name = call.get("tool")
+        name = name.strip() if isinstance(name, str) else ""
+        names.append(name)
+        coros.append(_dispatch(name, call.get("params") or {}))
+    # One failing call must not take the rest of the batch down with it.
+    responses = await asyncio.gather(*coros, return_exceptions=True)
+
+    results = []
+    for name, r in zip(names, responses):
+        if isinstance(r, BaseException):
+            logger.error("batch tool call %s failed", name, exc_info=r)
+            results.append({"tool": name, "status": 500, **TOOL_FAILED})
+        else:
+            results.append({"tool": name, "status": r.status_code, **orjson.loads(r.content)})
+    return OrjsonResponse({"results": results})
+
+async def convai_tool_router(request):
     """
     POST /api/agent/tools/
     Headers:
@@ -107,32 +202,44 @@ def convai_tool_router(request):
     Body examples:
       { "tool": "search.text", "params": { "q": "Norfolk, VA" } }
       { "tool": "search.nearby", "params": { "sw": "36.85,-76.33", "ne": "36.90,-76.20" } }
+      { "calls": [ { "tool": "search.text", "params": {...} }, { "tool": "finance.affordability", "params": {...} } ] }
 
     Response:
       { "data": {...}, "utterance": "short phrase to speak" }
+      batch: { "results": [ { "tool": "...", "status": 200, "data": {...}, "utterance": "..." }, ... ] }
+      search tools with "Accept: application/x-ndjson" stream one JSON object per line:
+        { "params": {...}, "navigate": "...", "count": N }, { "result": {...} } x N, { "utterance": "..." }
     """
+    # Django 4.2's csrf_exempt/require_POST wrap views in sync functions, so the
+    # async router checks the method itself and is marked exempt below.
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
     auth_err = verify_secret_or_401(request)
     if auth_err:
         return auth_err
 
     try:
-        body = json.loads(request.body.decode("utf-8"))
+        body = orjson.loads(request.body)
     except Exception:
-        return _bad_request("Invalid JSON body.")
+        return _static_bad_request(ERR_INVALID_JSON)
+    if not isinstance(body, dict):
+        return _static_bad_request(ERR_INVALID_JSON)
+
+    # Batch form runs its calls concurrently; single-call form is unchanged.
+    if "calls" in body and "tool" not in body:
+        return await _dispatch_batch(body["calls"])
 
     tool = (body.get("tool") or "").strip()
     params = body.get("params") or {}
+    stream = NDJSON_CONTENT_TYPE in request.headers.get("Accept", "")
+    return await _dispatch(tool, params, stream=stream)
 
-    if tool not in TOOL_REGISTRY:
-        return _bad_request(f"Unknown tool '{tool}'. Available: {', '.join(TOOL_REGISTRY.keys())}")
-
-    logger.info("tool_call name=%s params=%s", tool, params)
-    handler = TOOL_REGISTRY[tool]
-    return handler(params)
+convai_tool_router.csrf_exempt = True
 
 @require_GET
 def tools_echo(request):
     auth_err = verify_secret_or_401(request)
     if auth_err:
         return auth_err
-    return JsonResponse({"ok": True, "utterance": "Tools echo is alive."})
+    return OrjsonResponse({"ok": True, "utterance": "Tools echo is alive."})
@@ -9,6 +9,9 @@ from django.http import JsonResponse
 import traceback
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+# Built once; as_view() creates a new view callable on every call.
+_TOKEN_VIEW = TokenObtainPairView.as_view()
+
 class RegisterView(APIView):
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
@@ -43,7 +46,7 @@ def login_debug(request):
 
     try:
         # Delegate to the existing simplejwt view
-        return TokenObtainPairView.as_view()(request)
+        return _TOKEN_VIEW(request)
     except Exception as e:
         tb = traceback.format_exc()
         return JsonResponse({"error": str(e), "traceback": tb}, status=500)
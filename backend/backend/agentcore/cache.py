@@ -0,0 +1,88 @@
+import os
+import hashlib
+import logging
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+import redis.asyncio as aioredis
+from django.http import HttpResponse
+
+from backend.agentcore.loops import PerLoop
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.environ.get("REDIS_URL", "").strip()
+# How long an expired entry is kept around to answer when the upstream is failing.
+STALE_SECONDS = int(os.environ.get("AGENT_CACHE_STALE_SECONDS", "300"))
+
+# No REDIS_URL (local dev): caching is disabled and tools always hit upstream.
+# redis.asyncio pools are bound to the loop that created them, so one client per loop.
+_REDIS: Optional[PerLoop[aioredis.Redis]] = PerLoop(
+    lambda: aioredis.Redis.from_url(REDIS_URL, decode_responses=False),
+    close=aioredis.Redis.aclose,
+) if REDIS_URL else None
+
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[HttpResponse]]
+
+def _key(name: str, params: Dict[str, Any]) -> str:
+    raw = orjson.dumps(params, option=orjson.OPT_SORT_KEYS, default=str)
+    return f"tool:{name}:" + hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+def _from_cache(entry: Dict[bytes, bytes]) -> Optional[HttpResponse]:
+    if not entry or b"content" not in entry:
+        return None
+    return HttpResponse(entry[b"content"], content_type="application/json", status=int(entry[b"status"]))
+
+def cached(ttl_seconds: int) -> Callable[[ToolHandler], ToolHandler]:
+    """
+    Cache a tool's successful JSON response in Redis for `ttl_seconds`.
+    Entries outlive their TTL by STALE_SECONDS; if the upstream answers 5xx
+    after expiry, the stale copy is served instead of the error.
+    Calls with extra keyword options (e.g. stream=True) bypass the cache.
+    """
+    def decorator(fn: ToolHandler) -> ToolHandler:
+        name = fn.__name__
+
+        @wraps(fn)
+        async def wrapper(params: Dict[str, Any], **options: Any) -> HttpResponse:
+            if _REDIS is None or options:
+                return await fn(params, **options)
+            redis = await _REDIS.get()
+
+            key = _key(name, params)
+            fresh_key = f"{key}:fresh"
+            try:
+                is_fresh, entry = await redis.pipeline(transaction=False).exists(fresh_key).hgetall(key).execute()
+            except aioredis.RedisError:
+                logger.warning("tool cache read failed for %s", name, exc_info=True)
+                return await fn(params)
+
+            if is_fresh:
+                hit = _from_cache(entry)
+                if hit is not None:
+                    return hit
+
+            resp = await fn(params)
+            if resp.status_code >= 500:
+                stale = _from_cache(entry)
+                if stale is not None:
+                    logger.warning("tool %s upstream failed (%s); serving stale cache", name, resp.status_code)
+                    return stale
+                return resp
+
+            if resp.status_code == 200:
+                try:
+                    await (
+                        redis.pipeline(transaction=False)
+                        .hset(key, mapping={"content": resp.content, "status": resp.status_code})
+                        .expire(key, ttl_seconds + STALE_SECONDS)
+                        .setex(fresh_key, ttl_seconds, 1)
+                        .execute()
+                    )
+                except aioredis.RedisError:
+                    logger.warning("tool cache write failed for %s", name, exc_info=True)
+            return resp
+
+        return wrapper
+    return decorator
@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+
+from backend.agentcore.http import API_BASE, BACKOFF, DEFAULT_TIMEOUT, RETRIES
+from backend.agentcore.loops import PerLoop
+
+# Async client for the tool router, one per event loop (see PerLoop): pooled
+# keep-alive connections to the search API, with connect-level retries handled by
+# the transport (limits live on the transport since a custom transport ignores the
+# client-level ones).
+_CLIENTS: PerLoop[httpx.AsyncClient] = PerLoop(
+    lambda: httpx.AsyncClient(
+        base_url=API_BASE,
+        timeout=DEFAULT_TIMEOUT,
+        transport=httpx.AsyncHTTPTransport(
+            retries=RETRIES,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        ),
+    ),
+    close=httpx.AsyncClient.aclose,
+)
+
+# Gateway-style failures worth another try; anything else goes straight back.
+RETRY_STATUSES = frozenset({502, 503, 504})
+# Longest wait between attempts: the tool webhook has to answer within the
+# agent's timeout, so a large Retry-After is cut down to the backoff ceiling.
+MAX_RETRY_DELAY = BACKOFF * (2 ** RETRIES)
+
+def _retry_delay(resp: httpx.Response, attempt: int) -> float:
+    # Honour a numeric Retry-After (capped), otherwise exponential backoff.
+    retry_after = resp.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_DELAY)
+    return BACKOFF * (2 ** attempt)
+
+async def api_get_async(path: str, params=None, timeout: float = DEFAULT_TIMEOUT) -> httpx.Response:
+    """GET from the search API; 502/503/504 are retried up to RETRIES times, then the last response is returned."""
+    params = params or {}
+    client = await _CLIENTS.get()
+    for attempt in range(RETRIES + 1):
+        resp = await client.get(path, params=params, timeout=timeout)
+        if resp.status_code not in RETRY_STATUSES or attempt == RETRIES:
+            return resp
+        await resp.aclose()
+        await asyncio.sleep(_retry_delay(resp, attempt))
+    return resp
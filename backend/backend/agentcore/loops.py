@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class PerLoop(Generic[T]):
+    """
+    One instance of a loop-bound resource (httpx.AsyncClient, redis.asyncio.Redis)
+    per running event loop. Under daphne that is the single server loop; under
+    WSGI / runserver / tests async_to_sync runs each call on a throwaway
+    asyncio.run loop, whose connections must not be reused by the next call.
+
+    Each instance is closed when its loop shuts down: a parked async generator is
+    registered with the loop, and loop.shutdown_asyncgens() (run by asyncio.run,
+    and so by async_to_sync's own loops) finalizes it, which awaits `close`.
+    """
+
+    def __init__(self, factory: Callable[[], T], close: Callable[[T], Awaitable[Any]]):
+        self._factory = factory
+        self._close = close
+        # the generator references its loop, so a weak key would never be freed anyway
+        self._instances: Dict[asyncio.AbstractEventLoop, Tuple[T, Any]] = {}
+
+    async def _close_with_loop(self, loop: asyncio.AbstractEventLoop, obj: T):
+        try:
+            yield
+        finally:
+            self._instances.pop(loop, None)
+            await self._close(obj)
+
+    async def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        entry = self._instances.get(loop)
+        if entry is None:
+            obj = self._factory()
+            closer = self._close_with_loop(loop, obj)
+            entry = self._instances[loop] = (obj, closer)  # the loop only holds a weak ref to closer
+            await closer.__anext__()
+        return entry[0]
@@ -0,0 +1,9 @@
+import orjson
+from django.http import HttpResponse
+
+class OrjsonResponse(HttpResponse):
+    """JsonResponse equivalent that serializes with orjson (bytes out, no str round-trip)."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(orjson.dumps(data), **kwargs)
@@ -1,20 +1,27 @@
 import os
+import hmac
 import logging
 from typing import Optional
-from django.http import JsonResponse
 from django.http import HttpRequest
 
+from backend.agentcore.responses import OrjsonResponse
+
 logger = logging.getLogger(__name__)
 CONVAI_TOOL_SECRET = os.environ.get("CONVAI_TOOL_SECRET", "").strip()
+CONVAI_TOOL_SECRET_B = CONVAI_TOOL_SECRET.encode()
+
+if not CONVAI_TOOL_SECRET:
+    # once per process, not per webhook call
+    logger.warning("CONVAI_TOOL_SECRET not set; tool webhooks accept unauthenticated requests (dev mode).")
 
-def verify_secret_or_401(request: HttpRequest) -> Optional[JsonResponse]:
+def verify_secret_or_401(request: HttpRequest) -> Optional[OrjsonResponse]:
     """
     Verify X-Convai-Secret header for webhook calls.
-    If no secret is configured, allow (dev mode) but log a warning.
+    If no secret is configured, allow (dev mode; warned once at import).
     """
     if not CONVAI_TOOL_SECRET:
-        logger.warning("CONVAI_TOOL_SECRET not set; allowing request (dev mode).")
         return None
-    if request.headers.get("X-Convai-Secret", "") != CONVAI_TOOL_SECRET:
-        return JsonResponse({"error": "Unauthorized", "utterance": "Unauthorized"}, status=401)
+    provided = request.headers.get("X-Convai-Secret", "")
+    if not hmac.compare_digest(provided.encode(), CONVAI_TOOL_SECRET_B):
+        return OrjsonResponse({"error": "Unauthorized", "utterance": "Unauthorized"}, status=401)
     return None
@@ -1,6 +1,9 @@
 # backend/asgi.py
 import os
+import logging
 from django.core.asgi import get_asgi_application
+from django.core.exceptions import RequestAborted
+from django.http import HttpResponseServerError
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 
@@ -9,8 +12,39 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 django_asgi_app = get_asgi_application()
 
 from voiceagent.routing import websocket_urlpatterns  # noqa: E402
+from agenttools.views import convai_tool_router  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+AGENT_TOOLS_PATH = "/api/agent/tools/"
+
+async def agent_tools_app(scope, receive, send):
+    """
+    Serve the agent tool webhook without Django's middleware stack.
+    It only needs the shared-secret check, which convai_tool_router does itself;
+    request parsing and response sending reuse Django's ASGI handler.
+    """
+    try:
+        body_file = await django_asgi_app.read_body(receive)
+    except RequestAborted:
+        return
+    try:
+        request, error_response = django_asgi_app.create_request(scope, body_file)
+        try:
+            response = error_response or await convai_tool_router(request)
+        except Exception:
+            logger.exception("agent tool router failed")
+            response = HttpResponseServerError()
+        await django_asgi_app.send_response(response, send)
+    finally:
+        body_file.close()
+
+async def http_app(scope, receive, send):
+    if scope["path"] == AGENT_TOOLS_PATH:
+        return await agent_tools_app(scope, receive, send)
+    return await django_asgi_app(scope, receive, send)
 
 application = ProtocolTypeRouter({
-    "http": django_asgi_app,
+    "http": http_app,
     "websocket": AllowedHostsOriginValidator(URLRouter(websocket_urlpatterns)),
 })
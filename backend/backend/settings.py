@@ -4,20 +4,26 @@ Django settings for backend project (MVP-friendly for Render).
 
 from pathlib import Path
 import os
-from dotenv import load_dotenv
-from datetime import timedelta
 
 # ----------------------------------------------------------------------
 # Load environment
 # ----------------------------------------------------------------------
 BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv()  # loads .env locally; on Render, use Dashboard env vars
+# Load .env locally; on Render (no .env) skip python-dotenv entirely and use Dashboard env vars.
+# Same directories find_dotenv() would walk: settings dir, backend/, repo root.
+for _env_path in (Path(__file__).resolve().parent / ".env", BASE_DIR / ".env", BASE_DIR.parent / ".env"):
+    if _env_path.exists():
+        from dotenv import load_dotenv
+        load_dotenv(_env_path)
+        break
 
 # ----------------------------------------------------------------------
 # Core
 # ----------------------------------------------------------------------
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "django-insecure-development-placeholder")
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+# Agent-tools deployment profile: webhook-only instance without sessions.
+AGENT_ONLY = os.getenv("AGENT_ONLY", "false").lower() == "true"
 
 # Hosts / CORS
 RENDER_HOST = "vthacks13-speakspace.onrender.com"
@@ -76,15 +82,14 @@ os.environ.setdefault(
 
 # ----------------------------------------------------------------------
 # Apps
+#   API-only service (DRF + Channels): no admin, messages or staticfiles,
+#   so none of their imports or middleware are paid for at boot.
 # ----------------------------------------------------------------------
 INSTALLED_APPS = [
     "corsheaders",
-    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
-    "django.contrib.messages",
-    "django.contrib.staticfiles",
 
     # third-party
     "rest_framework",
@@ -101,28 +106,65 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # keep CORS very early
     "django.middleware.security.SecurityMiddleware",
-    # WhiteNoise (static) in prod only (optional, but handy on Render)
-    *(
-        ["whitenoise.middleware.WhiteNoiseMiddleware"]
-        if not DEBUG
-        else []
-    ),
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if AGENT_ONLY:
+    # The tool webhooks are csrf_exempt, secret-authenticated and never touch
+    # sessions; skip the per-request session lookup entirely.
+    # auth/contenttypes stay installed because DRF, simplejwt and authapp import them.
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "django.contrib.sessions"]
+    MIDDLEWARE = [
+        "corsheaders.middleware.CorsMiddleware",
+        "django.middleware.security.SecurityMiddleware",
+        "django.middleware.common.CommonMiddleware",
+        "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    ]
+
 # ----------------------------------------------------------------------
 # ASGI / Channels
 # ----------------------------------------------------------------------
 ASGI_APPLICATION = "backend.asgi.application"
-CHANNEL_LAYERS = {
-    # OK for MVP (single instance). Use Redis for scale or worker processes.
-    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
-}
+REDIS_URL = os.getenv("REDIS_URL", "").strip()
+if REDIS_URL:
+    # Shared across Daphne/Uvicorn workers so group_send fans out between processes.
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [REDIS_URL], "capacity": 1500, "expiry": 10},
+        }
+    }
+else:
+    # Local dev / single instance only.
+    CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    }
+
+# ----------------------------------------------------------------------
+# Cache
+#   The agent→UI mailbox (mapapp.agent_bridge) lives here, so it must be
+#   shared between workers: Redis when REDIS_URL is set, LocMem otherwise.
+# ----------------------------------------------------------------------
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                # redis-py 5 picks the hiredis C parser on its own when it is
+                # installed (redis[hiredis] in requirements), so no PARSER_CLASS.
+                "CONNECTION_POOL_KWARGS": {"max_connections": 50},
+                "IGNORE_EXCEPTIONS": True,
+            },
+        }
+    }
+    # A dead Redis degrades to cache misses instead of 500s.
+    DJANGO_REDIS_IGNORE_EXCEPTIONS = True
 
 # ----------------------------------------------------------------------
 # DRF / JWT
@@ -155,7 +197,6 @@ TEMPLATES = [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
-                "django.contrib.messages.context_processors.messages",
             ],
         },
     },
@@ -164,16 +205,46 @@ TEMPLATES = [
 WSGI_APPLICATION = "backend.wsgi.application"
 
 # ----------------------------------------------------------------------
-# Database (SQLite for MVP; use Postgres for persistence)
+# Database (SQLite for MVP; set DATABASE_URL for Postgres)
 #   ⚠️ On Render, SQLite is ephemeral across redeploys/restarts.
 # ----------------------------------------------------------------------
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
+if DATABASE_URL:
+    import dj_database_url
+
+    # No persistent connections: under daphne (ASGI) each request's sync code runs in its
+    # own thread context, so conn_max_age > 0 leaves one idle connection per thread
+    # instead of reusing them (Django ticket #33497). Put pgbouncer in front for pooling.
+    DATABASES = {
+        "default": dj_database_url.parse(DATABASE_URL, conn_max_age=0)
     }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
+    }
+
+# ----------------------------------------------------------------------
+# Logging
+#   Agent tool calls log at INFO; production defaults to WARNING for them.
+# ----------------------------------------------------------------------
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "agenttools": {
+            "handlers": ["console"],
+            "level": os.getenv("AGENTTOOLS_LOG_LEVEL", "INFO" if DEBUG else "WARNING"),
+            # daphne -v2 installs a root handler too; don't print every record twice
+            "propagate": False,
+        },
+    },
 }
-# If/when you add Postgres, set DATABASE_URL in env and parse with dj-database-url.
 
 # ----------------------------------------------------------------------
 # Password validation
@@ -193,15 +264,4 @@ TIME_ZONE = "UTC"
 USE_I18N = True
 USE_TZ = True
 
-# ----------------------------------------------------------------------
-# Static files
-# ----------------------------------------------------------------------
-STATIC_URL = "static/"
-STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
-
-# WhiteNoise settings (only active when middleware added in prod)
-if not DEBUG:
-    # gzip/brotli compression and long cache headers for versioned files
-    STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
-
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -15,11 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 # project/urls.py
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/auth/", include("authapp.urls")),  # our auth routes
     path("api/", include("mapapp.urls")),
     path("api/", include("voiceagent.urls")),  # ← NEW
@@ -27,3 +26,8 @@ urlpatterns = [
 
 ]
 
+# Admin isn't installed by default (API-only, see settings); mounted only if re-added.
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
@@ -1,20 +1,36 @@
 # mapapp/agent_bridge.py
+from django.conf import settings
 from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
 _KEY = "agent_ui_command"  # single-slot mailbox
+_REDIS_CACHE = settings.CACHES["default"]["BACKEND"] == "django_redis.cache.RedisCache"
+
+def _pop_message():
+    """Read and clear the mailbox; on Redis this is one atomic GETDEL so concurrent pollers can't both get it."""
+    if not _REDIS_CACHE:
+        msg = cache.get(_KEY)
+        if msg:
+            cache.delete(_KEY)
+        return msg
+    try:
+        data = get_redis_connection("default").execute_command("GETDEL", cache.make_key(_KEY))
+    except RedisError:
+        return None  # same as the cache's IGNORE_EXCEPTIONS behaviour
+    return cache.client.decode(data) if data is not None else None
 
 class AgentCommandView(APIView):
     permission_classes = [AllowAny]
     authentication_classes = []  # no JWT, no CSRF
 
     def get(self, request):
-        msg = cache.get(_KEY)
+        msg = _pop_message()
         if not msg:
             return Response({"pending": False})
-        cache.delete(_KEY)
         return Response({"pending": True, "message": msg})
 
     def post(self, request):
@@ -1,6 +1,21 @@
 # mapapp/serializers.py
+import re
+import sys
+
 from rest_framework import serializers
 
+# Interned so the validated mode (ChoiceField hands back the choice object itself)
+# is the very same string the comparisons below use.
+MODE_TEXT = sys.intern("text")
+MODE_NEARBY = sys.intern("nearby")
+_VALID_MODES = frozenset({MODE_TEXT, MODE_NEARBY})
+
+# "lat,lng" with optional whitespace; validates and captures in one match.
+# Each number takes the decimal forms float() does (sign, "36.", ".5", exponent);
+# inf/nan and digit underscores are refused, they are never real coordinates.
+_NUM = r"([+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)"
+_LATLNG_RE = re.compile(rf"^\s*{_NUM}\s*,\s*{_NUM}\s*$")
+
 
 class SearchQuerySerializer(serializers.Serializer):
     """
@@ -9,56 +24,52 @@ class SearchQuerySerializer(serializers.Serializer):
       - "text": requires q
       - "nearby": requires sw & ne
       - None/empty: legacy fallback allowed (we won't force strictness)
+    Valid sw/ne are also returned parsed as sw_parsed/ne_parsed = (lat, lng).
     """
-    mode = serializers.ChoiceField(choices=["text", "nearby"], required=False, allow_blank=True)
+    mode = serializers.ChoiceField(choices=sorted(_VALID_MODES), required=False, allow_blank=True)
     q = serializers.CharField(required=False, allow_blank=True)
     sw = serializers.CharField(required=False)  # "lat,lng"
     ne = serializers.CharField(required=False)  # "lat,lng"
 
     def validate(self, attrs):
-        mode = (attrs.get("mode") or "").strip().lower()
+        mode = attrs.get("mode") or ""  # ChoiceField already rejects anything but the exact choices
         q = (attrs.get("q") or "").strip()
         sw = attrs.get("sw")
         ne = attrs.get("ne")
 
-        if mode == "text":
+        if mode == MODE_TEXT:
             if not q:
                 raise serializers.ValidationError({"q": "Query (q) is required when mode=text."})
-        elif mode == "nearby":
+        elif mode == MODE_NEARBY:
             if not (sw and ne):
                 raise serializers.ValidationError({"bounds": "sw and ne are required when mode=nearby."})
-            # Optional: validate "lat,lng" format lightly
-            for label, v in (("sw", sw), ("ne", ne)):
-                try:
-                    lat_str, lng_str = v.split(",", 1)
-                    float(lat_str); float(lng_str)
-                except Exception:
-                    raise serializers.ValidationError({label: "Expected 'lat,lng'."})
         # else: legacy path, allow both q-only or bounds-only
 
+        for label, v in (("sw", sw), ("ne", ne)):
+            if not v:
+                continue
+            m = _LATLNG_RE.match(v)
+            if not m:
+                raise serializers.ValidationError({label: "Expected 'lat,lng'."})
+            attrs[label + "_parsed"] = (float(m.group(1)), float(m.group(2)))
+
         return attrs
 
 
-class PlaceSerializer(serializers.Serializer):
+
+class NearbyQuerySerializer(serializers.Serializer):
     """
-    Output serializer for a normalized place (apartment complex).
-    Matches the shape your React app expects.
+    Validates query params for /api/places/nearby/.
+    radius is clamped to 200..5000 m (not rejected); types is a comma list
+    of categories (see NEARBY_TYPE_MAP) returned lowercased as a list.
     """
-    id = serializers.CharField()
-    name = serializers.CharField(allow_blank=True, allow_null=True, required=False)
-    address = serializers.CharField(allow_blank=True, allow_null=True, required=False)
-
-    lat = serializers.FloatField(allow_null=True, required=False)
-    lng = serializers.FloatField(allow_null=True, required=False)
-
-    primaryType = serializers.CharField(allow_blank=True, allow_null=True, required=False)
-    types = serializers.ListField(
-        child=serializers.CharField(), required=False, allow_empty=True
-    )
+    lat = serializers.FloatField()
+    lng = serializers.FloatField()
+    radius = serializers.IntegerField(required=False, default=1500)
+    types = serializers.CharField(required=False, allow_blank=True, default="")
 
-    rating = serializers.FloatField(allow_null=True, required=False)
-    user_ratings_total = serializers.IntegerField(allow_null=True, required=False)
+    def validate_radius(self, value):
+        return max(200, min(value, 5000))
 
-    url = serializers.CharField(allow_blank=True, allow_null=True, required=False)
-    image_url = serializers.CharField(allow_blank=True, allow_null=True, required=False)
-    photoName = serializers.CharField(allow_blank=True, allow_null=True, required=False)
+    def validate_types(self, value):
+        return [t.strip() for t in value.lower().split(",") if t.strip()]
@@ -1,27 +1,113 @@
 # mapapp/services/places.py
 from __future__ import annotations
 import os
+import atexit
+import asyncio
+import hashlib
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Sequence
 import httpx
+import orjson
+from django.core.cache import cache
+
+from backend.agentcore.loops import PerLoop
 
 API_ROOT = "https://places.googleapis.com/v1"
 TIMEOUT = 20.0
 
 class PlacesError(Exception):
-    pass
+    def __init__(self, message: str = "", status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+# Resolved once at import (settings has already loaded .env by then).
+_API_KEY = os.getenv("GOOGLE_PLACES_KEY") or os.getenv("GOOGLE_MAPS_API_KEY") or ""
 
 def _server_key() -> str:
-    key = os.getenv("GOOGLE_PLACES_KEY") or os.getenv("GOOGLE_MAPS_API_KEY") or ""
-    if not key:
+    if not _API_KEY:
         raise PlacesError("Missing GOOGLE_PLACES_KEY or GOOGLE_MAPS_API_KEY.")
-    return key
+    return _API_KEY
+
+# One pooled client per process: keep-alive + HTTP/2 to places.googleapis.com
+# instead of a fresh TCP/TLS handshake per call.
+# httpx already sends Accept-Encoding for every decoder it has (gzip, deflate,
+# and br with the brotli extra from requirements) and decompresses transparently.
+_CLIENT_HEADERS = {"User-Agent": "speakspace/1.0"}
+
+_CLIENT = httpx.Client(
+    http2=True,
+    timeout=TIMEOUT,
+    follow_redirects=True,
+    headers=_CLIENT_HEADERS,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+)
+atexit.register(_CLIENT.close)
+
+# Async clients can't share connections across event loops, so keep one pooled
+# client per loop, closed again when that loop shuts down (see PerLoop).
+_ACLIENTS: PerLoop[httpx.AsyncClient] = PerLoop(
+    lambda: httpx.AsyncClient(
+        http2=True,
+        timeout=TIMEOUT,
+        follow_redirects=True,
+        headers=_CLIENT_HEADERS,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    ),
+    close=httpx.AsyncClient.aclose,
+)
+_aclient = _ACLIENTS.get
+
+async def shared_async_client() -> httpx.AsyncClient:
+    """Pooled client for the running event loop; also used by the photo proxy."""
+    return await _aclient()
+
+# ------------------------- Response cache -------------------------
+SEARCH_CACHE_TTL = 600      # text/nearby searches: 10 min
+GEOCODE_CACHE_TTL = 86400   # a place name's center doesn't move: 24 h
+DETAILS_CACHE_TTL = 86400   # place details change rarely: 24 h
 
-def _client() -> httpx.Client:
-    return httpx.Client(timeout=TIMEOUT, follow_redirects=True)
+def _cache_key(path: str, field_mask: str, content: bytes | None) -> str:
+    raw = b"\0".join((path.encode(), field_mask.encode(), content or b""))
+    return "places:" + hashlib.blake2b(raw, digest_size=16).hexdigest()
 
-def _auth_headers() -> dict:
-    return {"X-Goog-Api-Key": _server_key()}
+def _places_error(r: httpx.Response, label: str) -> PlacesError:
+    # Only the error path builds a message; decode just the head of the body, not all of it.
+    snippet = r.content[:300].decode("utf-8", "replace")
+    return PlacesError(f"{label} failed {r.status_code}: {snippet}", status_code=r.status_code)
+
+def _cached_call(method: str, path: str, *, headers: Mapping[str, str], ttl: int, label: str, content: bytes | None = None) -> dict:
+    """
+    Call the Places API with an already-encoded JSON body and return the decoded response.
+    Only 200 responses are cached (for `ttl` seconds); other statuses raise PlacesError.
+    """
+    key = _cache_key(path, headers.get("X-Goog-FieldMask", ""), content)
+    data = cache.get(key)
+    if data is not None:
+        return data
+    r = _CLIENT.request(method, f"{API_ROOT}{path}", headers=headers, content=content)
+    if r.status_code != 200:
+        raise _places_error(r, label)
+    data = orjson.loads(r.content)
+    cache.set(key, data, ttl)
+    return data
+
+async def _acached_call(method: str, path: str, *, headers: Mapping[str, str], ttl: int, label: str, content: bytes | None = None) -> dict:
+    """Async twin of _cached_call."""
+    key = _cache_key(path, headers.get("X-Goog-FieldMask", ""), content)
+    data = await cache.aget(key)
+    if data is not None:
+        return data
+    r = await (await _aclient()).request(method, f"{API_ROOT}{path}", headers=headers, content=content)
+    if r.status_code != 200:
+        raise _places_error(r, label)
+    data = orjson.loads(r.content)
+    await cache.aset(key, data, ttl)
+    return data
 
 # ------------------------- Field masks -------------------------
+# Ask only for what the normalizers read, so Google trims the response
+# (e.g. photos.name instead of full photo objects with attributions).
 SEARCH_FIELD_MASK = ",".join([
     "places.id",
     "places.displayName",
@@ -36,18 +122,25 @@ SEARCH_FIELD_MASK = ",".join([
     "places.userRatingCount",
 ])
 
-GEOCODE_FIELD_MASK = ",".join([
-    "places.id",
-    "places.displayName",
-    "places.location",
-    "places.primaryType",
-    "places.types",
-])
+# geocode only reads the first place's location (see _center_of_first)
+GEOCODE_FIELD_MASK = "places.location"
 
-DETAILS_FIELD_MASK_BASE = ",".join([
+# Fields PropertyDetail / the details batch ask for (a tuple: it is also the
+# lru_cache key for the details headers, so no per-call conversion).
+DETAILS_FIELDS = (
     "id","displayName","formattedAddress","location",
-    "googleMapsUri","websiteUri","rating","userRatingCount","photos",
-])
+    "googleMapsUri","websiteUri","rating","userRatingCount","photos.name",
+)
+DETAILS_FIELD_MASK_BASE = ",".join(DETAILS_FIELDS)
+
+# Static request headers, built once; read-only so callers can't mutate the shared copy.
+_AUTH_HEADERS_ONLY = MappingProxyType({"X-Goog-Api-Key": _API_KEY})
+_SEARCH_HEADERS = MappingProxyType({
+    "X-Goog-Api-Key": _API_KEY, "X-Goog-FieldMask": SEARCH_FIELD_MASK, "Content-Type": "application/json",
+})
+_GEOCODE_HEADERS = MappingProxyType({
+    "X-Goog-Api-Key": _API_KEY, "X-Goog-FieldMask": GEOCODE_FIELD_MASK, "Content-Type": "application/json",
+})
 
 # ------------------------- Helpers -------------------------
 
@@ -64,34 +157,39 @@ LOCALITY_TYPES = {
     "administrative_area_level_2", "administrative_area_level_1",
 }
 
-def text_search_apartments(*, text_query: str, page_size: int = 15) -> list[dict]:
-    headers = {**_auth_headers(), "X-Goog-FieldMask": SEARCH_FIELD_MASK}
-    body = {
-        "textQuery": text_query,
+# searchNearby bodies for nearby_search_apartments: only lat/lng/radius/pageSize vary,
+# so format them straight into pre-encoded JSON instead of building and encoding a dict.
+# Centers are sent at 4 decimals (~11 m): small map pans then reuse the cached response.
+_NEARBY_TMPL = (
+    b'{"locationRestriction":{"circle":{"center":{"latitude":%.4f,"longitude":%.4f},"radius":%d}},'
+    b'"pageSize":%d}'
+)
+_NEARBY_APT_TMPL = _NEARBY_TMPL[:-1] + b',"includedTypes":' + orjson.dumps(ALLOWED_APARTMENT_TYPES) + b"}"
+
+def _text_search_body(text_query: str, page_size: int) -> dict:
+    return {
+        "textQuery": _normalize_query(text_query),
         "pageSize": max(1, min(int(page_size or 15), 20)),
         "includedType": "apartment_complex",  # singular for searchText
     }
-    with _client() as c:
-        r = c.post(f"{API_ROOT}/places:searchText", headers=headers, json=body)
-        if r.status_code == 400:
-            # Retry without filter if project/region rejects includedType on text search
-            body.pop("includedType", None)
-            r = c.post(f"{API_ROOT}/places:searchText", headers=headers, json=body)
-    if r.status_code != 200:
-        raise PlacesError(f"searchText failed {r.status_code}: {r.text[:300]}")
-    return r.json().get("places") or []
 
-def geocode_center(text_query: str) -> tuple[float,float] | None:
-    """
-    Use searchText to resolve a city/zip to a center lat/lng (1 result).
-    """
-    headers = {**_auth_headers(), "X-Goog-FieldMask": GEOCODE_FIELD_MASK}
-    body = {"textQuery": text_query, "pageSize": 1}
-    with _client() as c:
-        r = c.post(f"{API_ROOT}/places:searchText", headers=headers, json=body)
-    if r.status_code != 200:
-        return None
-    places_ = r.json().get("places") or []
+def _nearby_body(center: dict, radius_m: int, page_size: int) -> dict:
+    lat = round(float(center["lat"]), 4); lng = round(float(center["lng"]), 4)
+    return {
+        "locationRestriction": {"circle": {"center": {"latitude": lat, "longitude": lng}, "radius": int(radius_m)}},
+        "pageSize": max(1, min(int(page_size or 20), 20)),
+    }
+
+def _nearby_apartments_payload(center: dict, radius_m: int, page_size: int, strict: bool) -> bytes:
+    tmpl = _NEARBY_APT_TMPL if strict else _NEARBY_TMPL
+    return tmpl % (float(center["lat"]), float(center["lng"]), int(radius_m), max(1, min(int(page_size or 15), 20)))
+
+def _normalize_query(text_query: str) -> str:
+    # "Norfolk, VA" / " norfolk,  va " resolve the same; normalize so they share a cache entry
+    return " ".join(text_query.split()).lower()
+
+def _center_of_first(data: dict) -> tuple[float,float] | None:
+    places_ = data.get("places") or []
     if not places_:
         return None
     p = places_[0]
@@ -102,99 +200,242 @@ def geocode_center(text_query: str) -> tuple[float,float] | None:
         return None
     return float(lat), float(lng)
 
+@lru_cache(maxsize=32)
+def _details_headers_for(fields: tuple[str, ...]) -> Mapping[str, str]:
+    # read-only so the cached mapping can be shared between calls
+    return MappingProxyType({**_AUTH_HEADERS_ONLY, "X-Goog-FieldMask": ",".join(fields)})
+
+def _details_headers(fields: Sequence[str]) -> Mapping[str, str]:
+    _server_key()
+    if fields:
+        return _details_headers_for(fields if type(fields) is tuple else tuple(fields))
+    return _AUTH_HEADERS_ONLY
+
+def text_search_apartments(*, text_query: str, page_size: int = 15) -> list[dict]:
+    _server_key()
+    headers = _SEARCH_HEADERS
+    body = _text_search_body(text_query, page_size)
+    try:
+        data = _cached_call("POST", "/places:searchText", headers=headers, content=orjson.dumps(body), ttl=SEARCH_CACHE_TTL, label="searchText")
+    except PlacesError as e:
+        if e.status_code != 400:
+            raise
+        # Retry without filter if project/region rejects includedType on text search
+        body.pop("includedType", None)
+        data = _cached_call("POST", "/places:searchText", headers=headers, content=orjson.dumps(body), ttl=SEARCH_CACHE_TTL, label="searchText")
+    return data.get("places") or []
+
+def geocode_center(text_query: str) -> tuple[float,float] | None:
+    """
+    Use searchText to resolve a city/zip to a center lat/lng (1 result).
+    """
+    _server_key()
+    headers = _GEOCODE_HEADERS
+    body = {"textQuery": _normalize_query(text_query), "pageSize": 1}
+    try:
+        data = _cached_call("POST", "/places:searchText", headers=headers, content=orjson.dumps(body), ttl=GEOCODE_CACHE_TTL, label="geocode")
+    except PlacesError:
+        return None
+    return _center_of_first(data)
+
 def nearby_search_apartments(center: dict, *, radius_m: int, page_size: int = 15, strict: bool = True) -> list[dict]:
-    headers = {**_auth_headers(), "X-Goog-FieldMask": SEARCH_FIELD_MASK}
-    lat = float(center["lat"]); lng = float(center["lng"])
-    body = {
-        "locationRestriction": {"circle": {"center": {"latitude": lat, "longitude": lng}, "radius": int(radius_m)}},
-        "pageSize": max(1, min(int(page_size or 15), 20)),
-    }
-    if strict:
-        body["includedTypes"] = ALLOWED_APARTMENT_TYPES
-    with _client() as c:
-        r = c.post(f"{API_ROOT}/places:searchNearby", headers=headers, json=body)
-    if r.status_code != 200:
-        raise PlacesError(f"searchNearby failed {r.status_code}: {r.text[:300]}")
-    return r.json().get("places") or []
+    _server_key()
+    headers = _SEARCH_HEADERS
+    payload = _nearby_apartments_payload(center, radius_m, page_size, strict)
+    data = _cached_call("POST", "/places:searchNearby", headers=headers, content=payload, ttl=SEARCH_CACHE_TTL, label="searchNearby")
+    return data.get("places") or []
 
 def search_nearby_v1(center: dict, *, radius_m: int, included_types: list[str] | None, max_results: int = 20) -> dict:
-    headers = {**_auth_headers(), "X-Goog-FieldMask": SEARCH_FIELD_MASK}
-    lat = float(center["lat"]); lng = float(center["lng"])
-    body = {
-        "locationRestriction": {"circle": {"center": {"latitude": lat, "longitude": lng}, "radius": int(radius_m)}},
-        "pageSize": max(1, min(int(max_results or 20), 20)),
-    }
+    _server_key()
+    headers = _SEARCH_HEADERS
+    body = _nearby_body(center, radius_m, max_results)
     if included_types:
         body["includedTypes"] = included_types
-    with _client() as c:
-        r = c.post(f"{API_ROOT}/places:searchNearby", headers=headers, json=body)
-    if r.status_code != 200:
-        raise PlacesError(f"searchNearby_v1 failed {r.status_code}: {r.text[:300]}")
-    return r.json()
+    return _cached_call("POST", "/places:searchNearby", headers=headers, content=orjson.dumps(body), ttl=SEARCH_CACHE_TTL, label="searchNearby_v1")
 
-def details_v1(place_id: str, fields: list[str]) -> dict:
-    headers = _auth_headers()
-    if fields:
-        headers["X-Goog-FieldMask"] = ",".join(fields)
-    with _client() as c:
-        r = c.get(f"{API_ROOT}/places/{place_id}", headers=headers)
-    if r.status_code != 200:
-        raise PlacesError(f"details_v1 failed {r.status_code}: {r.text[:300]}")
-    return r.json()
+def details_v1(place_id: str, fields: Sequence[str]) -> dict:
+    headers = _details_headers(fields)
+    return _cached_call("GET", f"/places/{place_id}", headers=headers, ttl=DETAILS_CACHE_TTL, label="details_v1")
+
+# ------------------------- Async variants -------------------------
+# Same calls for async callers, so several Places requests can be overlapped
+# with asyncio.gather instead of running back to back.
+
+async def text_search_apartments_async(*, text_query: str, page_size: int = 15) -> list[dict]:
+    _server_key()
+    headers = _SEARCH_HEADERS
+    body = _text_search_body(text_query, page_size)
+    try:
+        data = await _acached_call("POST", "/places:searchText", headers=headers, content=orjson.dumps(body), ttl=SEARCH_CACHE_TTL, label="searchText")
+    except PlacesError as e:
+        if e.status_code != 400:
+            raise
+        body.pop("includedType", None)
+        data = await _acached_call("POST", "/places:searchText", headers=headers, content=orjson.dumps(body), ttl=SEARCH_CACHE_TTL, label="searchText")
+    return data.get("places") or []
+
+async def geocode_center_async(text_query: str) -> tuple[float,float] | None:
+    _server_key()
+    headers = _GEOCODE_HEADERS
+    body = {"textQuery": _normalize_query(text_query), "pageSize": 1}
+    try:
+        data = await _acached_call("POST", "/places:searchText", headers=headers, content=orjson.dumps(body), ttl=GEOCODE_CACHE_TTL, label="geocode")
+    except PlacesError:
+        return None
+    return _center_of_first(data)
+
+async def nearby_search_apartments_async(center: dict, *, radius_m: int, page_size: int = 15, strict: bool = True) -> list[dict]:
+    _server_key()
+    headers = _SEARCH_HEADERS
+    payload = _nearby_apartments_payload(center, radius_m, page_size, strict)
+    data = await _acached_call("POST", "/places:searchNearby", headers=headers, content=payload, ttl=SEARCH_CACHE_TTL, label="searchNearby")
+    return data.get("places") or []
+
+async def search_nearby_v1_async(center: dict, *, radius_m: int, included_types: list[str] | None, max_results: int = 20) -> dict:
+    _server_key()
+    headers = _SEARCH_HEADERS
+    body = _nearby_body(center, radius_m, max_results)
+    if included_types:
+        body["includedTypes"] = included_types
+    return await _acached_call("POST", "/places:searchNearby", headers=headers, content=orjson.dumps(body), ttl=SEARCH_CACHE_TTL, label="searchNearby_v1")
+
+async def details_v1_async(place_id: str, fields: Sequence[str]) -> dict:
+    headers = _details_headers(fields)
+    return await _acached_call("GET", f"/places/{place_id}", headers=headers, ttl=DETAILS_CACHE_TTL, label="details_v1")
+
+async def text_search_first_async(queries: list[str], *, page_size: int = 15) -> list[dict]:
+    """
+    Return the first non-empty text search result in query order (same pick as
+    trying them one after another). Only the first query is sent up front, since
+    it usually has results and every variant is a billed call; if it comes back
+    empty the remaining variants run concurrently. A failed fallback only raises
+    if no earlier one returned results.
+    """
+    if not queries:
+        return []
+    first = await text_search_apartments_async(text_query=queries[0], page_size=page_size)
+    if first or len(queries) == 1:
+        return first
+    results = await asyncio.gather(
+        *(text_search_apartments_async(text_query=q, page_size=page_size) for q in queries[1:]),
+        return_exceptions=True,
+    )
+    for r in results:
+        if isinstance(r, BaseException):
+            raise r
+        if r:
+            return r
+    return []
+
+async def search_nearby_per_type_async(center: dict, *, radius_m: int, included_types: list[str], max_results: int = 20) -> dict:
+    """
+    One searchNearby per type, concurrently, merged by place id. Used when the
+    combined call is rejected: types the API refuses are skipped instead of
+    failing the whole request (raises only if every type fails).
+    """
+    types = list(dict.fromkeys(included_types))
+    results = await asyncio.gather(
+        *(search_nearby_v1_async(center, radius_m=radius_m, included_types=[t], max_results=max_results) for t in types),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if len(errors) == len(results):
+        raise errors[0]
+    for err in errors:
+        if not isinstance(err, PlacesError):
+            raise err
+    seen: set = set()
+    merged: list[dict] = []
+    for r in results:
+        if isinstance(r, BaseException):
+            continue
+        for p in r.get("places") or []:
+            pid = p.get("id")
+            if pid in seen:
+                continue
+            seen.add(pid)
+            merged.append(p)
+    return {"places": merged[:max_results]}
+
+async def _details_or_error(place_id: str, fields: Sequence[str]) -> dict | PlacesError:
+    # transport failures (timeouts, connect errors) count against this id only, as a 502
+    try:
+        return await details_v1_async(place_id, fields)
+    except PlacesError as e:
+        return e
+    except httpx.HTTPError as e:
+        return PlacesError(f"details_v1 failed: {e}", status_code=502)
+
+async def details_many_async(place_ids: list[str], fields: Sequence[str]) -> dict[str, dict | PlacesError]:
+    """
+    Fetch details for several places concurrently (deduplicated, input order kept).
+    Maps each id to its raw details, or to the PlacesError it failed with.
+    """
+    ids = list(dict.fromkeys(place_ids))
+    results = await asyncio.gather(*(_details_or_error(i, fields) for i in ids))
+    return dict(zip(ids, results))
 
 # ------------------------- Normalizers -------------------------
+# Hot path (every search result): plain local lookups and dict literals.
+
+_EMPTY: dict = {}
 
 def _first_photo_name(p: dict) -> str | None:
-    photos = p.get("photos") or []
-    if not photos: return None
-    return photos[0].get("name") or None
+    photos = p.get("photos")
+    return (photos[0].get("name") or None) if photos else None
 
-def _name_text(val):
-    if isinstance(val, dict): return val.get("text")
-    return val
+def _photo_names(p: dict) -> tuple[str | None, list[str]]:
+    # one pass over photos for both the list and the first name
+    names = [ph["name"] for ph in (p.get("photos") or []) if isinstance(ph, dict) and ph.get("name")]
+    return (names[0] if names else None), names
 
-def normalize_place(p: dict) -> dict:
+def _base_fields(p: dict) -> dict:
+    """Fields every normalizer emits: id, name, address, lat/lng, googleMapsUri."""
+    loc = p.get("location") or _EMPTY
+    display = p.get("displayName")
     return {
         "id": p.get("id"),
-        "name": _name_text(p.get("displayName")),
+        "name": display.get("text") if type(display) is dict else display,
         "address": p.get("formattedAddress"),
-        "lat": (p.get("location") or {}).get("latitude"),
-        "lng": (p.get("location") or {}).get("longitude"),
+        "lat": loc.get("latitude"),
+        "lng": loc.get("longitude"),
         "googleMapsUri": p.get("googleMapsUri"),
-        "websiteUri": p.get("websiteUri"),
-        "primaryType": p.get("primaryType"),
-        "types": p.get("types") or [],
-        "photoName": _first_photo_name(p),
-        "rating": p.get("rating"),
-        "userRatingCount": p.get("userRatingCount"),
     }
 
-def normalize_v1_place_basic(p: dict) -> dict:
+def normalize_place(p: dict) -> dict:
+    # Runs for every search result: written out as one literal for SEARCH_FIELD_MASK
+    # (keep in sync with it) instead of _base_fields + item assignments.
+    loc = p.get("location") or _EMPTY
+    display = p.get("displayName")
+    photos = p.get("photos")
     return {
         "id": p.get("id"),
-        "name": _name_text(p.get("displayName")),
+        "name": display.get("text") if type(display) is dict else display,
         "address": p.get("formattedAddress"),
-        "lat": (p.get("location") or {}).get("latitude"),
-        "lng": (p.get("location") or {}).get("longitude"),
+        "lat": loc.get("latitude"),
+        "lng": loc.get("longitude"),
         "googleMapsUri": p.get("googleMapsUri"),
+        "websiteUri": p.get("websiteUri"),
         "primaryType": p.get("primaryType"),
         "types": p.get("types") or [],
-        "photoName": _first_photo_name(p),
-    }
-
-def normalize_details_basic(p: dict) -> dict:
-    return {
-        "id": p.get("id"),
-        "name": _name_text(p.get("displayName")),
-        "address": p.get("formattedAddress"),
-        "lat": (p.get("location") or {}).get("latitude"),
-        "lng": (p.get("location") or {}).get("longitude"),
-        "googleMapsUri": p.get("googleMapsUri"),
-        "websiteUri": p.get("websiteUri"),
+        "photoName": (photos[0].get("name") or None) if photos else None,
         "rating": p.get("rating"),
         "userRatingCount": p.get("userRatingCount"),
-        "photoName": _first_photo_name(p),
-        "photos": [ph.get("name") for ph in (p.get("photos") or []) if isinstance(ph, dict) and ph.get("name")],
-        "types": p.get("types") or [],
-        "primaryType": p.get("primaryType"),
     }
+
+def normalize_v1_place_basic(p: dict) -> dict:
+    out = _base_fields(p)
+    out["primaryType"] = p.get("primaryType")
+    out["types"] = p.get("types") or []
+    out["photoName"] = _first_photo_name(p)
+    return out
+
+def normalize_details_basic(p: dict) -> dict:
+    out = _base_fields(p)
+    out["websiteUri"] = p.get("websiteUri")
+    out["rating"] = p.get("rating")
+    out["userRatingCount"] = p.get("userRatingCount")
+    out["types"] = p.get("types") or []
+    out["primaryType"] = p.get("primaryType")
+    out["photoName"], out["photos"] = _photo_names(p)
+    return out
@@ -1,12 +1,14 @@
 # mapapp/urls.py
 from django.urls import path
-from .views import PropertySearch, PlacePhoto, PropertyDetail, NearbyAround, AgentTestEnqueue
+from .views import PropertySearch, PlacePhoto, PropertyDetail, PropertyDetailsBatch, NearbyAround, AgentTestEnqueue
 from .agent_bridge import AgentCommandView
 
 app_name = "mapapp"
 
 urlpatterns = [
     path("properties/search/", PropertySearch.as_view(), name="properties-search"),
+    # before <place_id>/ so "details_batch" isn't taken for an id
+    path("properties/details_batch/", PropertyDetailsBatch.as_view(), name="details-batch"),
     path("properties/<str:place_id>/", PropertyDetail.as_view(), name="detail"),
     path("places/photo/", PlacePhoto.as_view(), name="places-photo"),
     path("places/nearby/", NearbyAround.as_view(), name="nearby"),
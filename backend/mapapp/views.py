@@ -1,19 +1,29 @@
 # mapapp/views.py
-from typing import Optional, Tuple, Dict
-from math import cos, radians
+from typing import Tuple, Dict
+from math import cos, hypot
+from functools import lru_cache
 import os
+import hashlib
 import logging
+
 import httpx
+import orjson
 
+from asgiref.sync import async_to_sync
 from django.conf import settings
-from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseNotModified, JsonResponse, StreamingHttpResponse,
+)
+from django.views import View
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from backend.agentcore.responses import OrjsonResponse
 from .services import places
-from .serializers import SearchQuerySerializer, PlaceSerializer
+from .serializers import SearchQuerySerializer, NearbyQuerySerializer, MODE_TEXT, MODE_NEARBY
 from django.core.cache import cache
 from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
@@ -23,21 +33,95 @@ logger = logging.getLogger(__name__)
 def _server_places_key() -> str:
     return os.getenv("GOOGLE_MAPS_API_KEY") or os.getenv("GOOGLE_PLACES_KEY") or ""
 
-def bounds_to_center_radius(sw: str, ne: str) -> Optional[Tuple[float, float, int]]:
-    try:
-        sw_lat, sw_lng = map(float, sw.split(","))
-        ne_lat, ne_lng = map(float, ne.split(","))
-    except Exception:
-        return None
+_DEG2RAD = 0.017453292519943295  # pi / 180
+_M_PER_DEG = 111_000.0  # metres per degree of latitude (approx.)
+
+def bounds_to_center_radius(sw: Tuple[float, float], ne: Tuple[float, float]) -> Tuple[float, float, int]:
+    # sw/ne come pre-parsed from SearchQuerySerializer (sw_parsed / ne_parsed)
+    sw_lat, sw_lng = sw
+    ne_lat, ne_lng = ne
     center_lat = (sw_lat + ne_lat) / 2.0
     center_lng = (sw_lng + ne_lng) / 2.0
-    lat_m = (ne_lat - sw_lat) * 111_000
-    lng_m = (ne_lng - sw_lng) * 111_000 * cos(radians(center_lat))
-    diag = (lat_m ** 2 + lng_m ** 2) ** 0.5
-    radius_m = int(diag / 2)
-    radius_m = max(500, min(radius_m, 30_000))
+    radius_m = int(hypot((ne_lat - sw_lat) * _M_PER_DEG,
+                         (ne_lng - sw_lng) * _M_PER_DEG * cos(center_lat * _DEG2RAD)) / 2)
+    radius_m = 500 if radius_m < 500 else 30_000 if radius_m > 30_000 else radius_m
     return (center_lat, center_lng, radius_m)
 
+# Place types PropertySearch keeps (falls back to everything if none match).
+ALLOWED_TYPES = frozenset({
+    "apartment_complex",
+    "apartment_rental_agency",
+    "apartment",
+    "apartment_building",
+    "condominium_complex",
+    "property_management_company",
+    "real_estate_agency",
+})
+
+def _is_apartment(r: dict) -> bool:
+    return (
+        r["primaryType"] in ALLOWED_TYPES
+        or not ALLOWED_TYPES.isdisjoint(r["types"])
+        or "apartment" in (r["name"] or "").lower()
+    )
+
+def search_properties(mode: str, q: str = "", sw=None, ne=None) -> list[dict]:
+    """
+    The PropertySearch pipeline as a plain function: Places lookups with the
+    text/nearby fallbacks, normalized and filtered to apartment-like places.
+    sw/ne are (lat, lng) tuples. Raises places.PlacesError.
+    In-process callers (voice agent, agent bus) use this instead of calling
+    /api/properties/search/ over loopback HTTP.
+    """
+    raw = []
+
+    if mode == MODE_TEXT:
+        # Try direct text searches first (3 variants, fired concurrently; first non-empty wins)
+        attempts = [f"apartments near {q}", f"apartments in {q}", f"{q} apartments"] if q else ["apartments"]
+        raw = async_to_sync(places.text_search_first_async)(attempts, page_size=15)
+
+        # If still empty, geocode the query to a center and run nearby with widening radius
+        if not raw and q:
+            center = places.geocode_center(q)
+            if center:
+                lat, lng = center
+                for radius in (4000, 8000, 16000, 24000, 30000):
+                    raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=radius, page_size=15, strict=True)
+                    if raw:
+                        break
+                # final fallback: nearby without strict apartment filters
+                if not raw:
+                    raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=16000, page_size=15, strict=False)
+
+    elif mode == MODE_NEARBY:
+        lat, lng, radius_m = bounds_to_center_radius(sw, ne)
+        raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=radius_m, page_size=15, strict=True)
+        if not raw and radius_m < 16000:
+            raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=16000, page_size=15, strict=False)
+
+    else:
+        # Fallback: prefer nearby if bounds given; otherwise text
+        if sw and ne and not q:
+            lat, lng, radius_m = bounds_to_center_radius(sw, ne)
+            raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=radius_m, page_size=15, strict=True)
+        else:
+            attempts = [f"apartments near {q}", f"apartments in {q}", q or "apartments"]
+            raw = async_to_sync(places.text_search_first_async)(attempts, page_size=15)
+            if not raw and q:
+                center = places.geocode_center(q)
+                if center:
+                    lat, lng = center
+                    raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=10000, page_size=15, strict=True)
+
+    # one pass: normalize and keep apartment-like places, falling back to all
+    normalized, filtered = [], []
+    for p in raw or ():
+        r = places.normalize_place(p)
+        normalized.append(r)
+        if _is_apartment(r):
+            filtered.append(r)
+    return filtered or normalized
+
 class PropertySearch(APIView):
     permission_classes = [AllowAny]
     authentication_classes = []
@@ -48,100 +132,114 @@ class PropertySearch(APIView):
             return Response({"results": [], "error": qp.errors}, status=400)
         params = qp.validated_data
 
-        mode = (params.get("mode") or "").strip().lower()
-        q    = (params.get("q") or "").strip()
-        sw   = params.get("sw")
-        ne   = params.get("ne")
-
         try:
-            raw = []
-
-            if mode == "text":
-                # Try direct text searches first (3 variants)
-                attempts = [f"apartments near {q}", f"apartments in {q}", f"{q} apartments"] if q else ["apartments"]
-                for txt in attempts:
-                    raw = places.text_search_apartments(text_query=txt, page_size=15)
-                    if raw:
-                        break
-
-                # If still empty, geocode the query to a center and run nearby with widening radius
-                if not raw and q:
-                    center = places.geocode_center(q)
-                    if center:
-                        lat, lng = center
-                        for radius in (4000, 8000, 16000, 24000, 30000):
-                            raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=radius, page_size=15, strict=True)
-                            if raw:
-                                break
-                        # final fallback: nearby without strict apartment filters
-                        if not raw:
-                            raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=16000, page_size=15, strict=False)
-
-            elif mode == "nearby":
-                br = bounds_to_center_radius(sw, ne)
-                if not br:
-                    return Response({"results": [], "error": "Invalid bounds."}, status=400)
-                lat, lng, radius_m = br
-                raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=radius_m, page_size=15, strict=True)
-                if not raw and radius_m < 16000:
-                    raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=16000, page_size=15, strict=False)
-
-            else:
-                # Fallback: prefer nearby if bounds given; otherwise text
-                if sw and ne and not q:
-                    br = bounds_to_center_radius(sw, ne)
-                    if not br:
-                        return Response({"results": [], "error": "Invalid bounds."}, status=400)
-                    lat, lng, radius_m = br
-                    raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=radius_m, page_size=15, strict=True)
-                else:
-                    attempts = [f"apartments near {q}", f"apartments in {q}", q or "apartments"]
-                    for txt in attempts:
-                        if not txt: continue
-                        raw = places.text_search_apartments(text_query=txt, page_size=15)
-                        if raw: break
-                    if not raw and q:
-                        center = places.geocode_center(q)
-                        if center:
-                            lat, lng = center
-                            raw = places.nearby_search_apartments({"lat": lat, "lng": lng}, radius_m=10000, page_size=15, strict=True)
-
-            normalized = [places.normalize_place(p) for p in (raw or [])]
-
-            ALLOWED_TYPES = {
-                "apartment_complex",
-                "apartment_rental_agency",
-                "apartment",
-                "apartment_building",
-                "condominium_complex",
-                "property_management_company",
-                "real_estate_agency",
-            }
-            filtered = [
-                r for r in normalized
-                if (r.get("primaryType") in ALLOWED_TYPES)
-                or any(t in ALLOWED_TYPES for t in (r.get("types") or []))
-                or ("apartment" in (r.get("name") or "").lower())
-            ]
-            out = filtered if filtered else normalized
-
-            serializer = PlaceSerializer(out, many=True)
-            return Response({"results": serializer.data, "count": len(serializer.data)})
+            out = search_properties(
+                params.get("mode") or "",
+                (params.get("q") or "").strip(),
+                params.get("sw_parsed"),
+                params.get("ne_parsed"),
+            )
+            # normalize_place already emits the wire shape: encode once with orjson
+            # instead of going through DRF's content negotiation and JSON renderer
+            return _json_revalidated(request, {"results": out, "count": len(out)})
 
         except places.PlacesError as e:
             logger.exception("Places error: %s", e)
             return Response({"results": [], "count": 0, "error": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
 
-class PlacePhoto(APIView):
-    permission_classes = [AllowAny]
-    authentication_classes = []
-
-    def get(self, request):
+PHOTO_CHUNK = 64 * 1024
+# Photo names are content-addressed: browsers never need to revalidate within a day
+# and shared caches / a CDN in front of Render may keep them for 30 days.
+PHOTO_CACHE_CONTROL = "public, max-age=86400, s-maxage=2592000, immutable"
+
+def _photo_etag(name: str, ref: str, maxwidth: str, maxheight: str) -> str:
+    # A photo name/ref plus size always maps to the same image, so the ETag
+    # is derived from the request alone and can be checked before going upstream.
+    raw = f"{name}|{ref}|{maxwidth}|{maxheight}".encode()
+    return '"%s"' % hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+# Search results: short freshness, then clients/CDN revalidate against the ETag.
+SEARCH_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+def _json_revalidated(request, data) -> HttpResponse:
+    """orjson-encoded JSON with a body-hash ETag; 304 (no body) if the client already has it."""
+    body = orjson.dumps(data)
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+    if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+        resp = HttpResponseNotModified()
+    else:
+        resp = HttpResponse(body, content_type="application/json")
+    resp["ETag"] = etag
+    resp["Cache-Control"] = SEARCH_CACHE_CONTROL
+    return resp
+
+async def _stream_and_close(r):
+    try:
+        async for chunk in r.aiter_bytes(PHOTO_CHUNK):
+            yield chunk
+    finally:
+        await r.aclose()
+
+async def _proxy_image(url: str, params: dict, *, etag: str, stream: bool, debug_upstream: bool = False) -> HttpResponse:
+    """
+    Relay an upstream image over the shared (pooled, HTTP/2) Places client.
+    With `stream`, bytes are passed on as they arrive. Only do that under ASGI:
+    under WSGI the view's async_to_sync loop (and the client bound to it) is
+    closed before Django iterates the body, so the image is read up front.
+    """
+    client = await places.shared_async_client()
+    try:
+        r = await client.send(client.build_request("GET", url, params=params, timeout=15.0), stream=True)
+    except httpx.HTTPError:
+        return HttpResponse(status=502)
+    ctype = r.headers.get("content-type", "")
+    if r.status_code != 200 or "image" not in ctype:
+        await r.aread()
+        await r.aclose()
+        if debug_upstream and settings.DEBUG:
+            return JsonResponse({"status": r.status_code, "upstream": r.text}, status=502, safe=False)
+        return HttpResponse(status=502)
+    if stream:
+        resp = StreamingHttpResponse(_stream_and_close(r), content_type=ctype)
+        # aiter_bytes decodes any content-encoding, so only pass the length through for identity bodies
+        if "content-length" in r.headers and "content-encoding" not in r.headers:
+            resp["Content-Length"] = r.headers["content-length"]
+    else:
+        try:
+            await r.aread()
+        except httpx.HTTPError:
+            return HttpResponse(status=502)
+        finally:
+            await r.aclose()
+        resp = HttpResponse(r.content, content_type=ctype)
+    resp["ETag"] = etag
+    resp["Cache-Control"] = PHOTO_CACHE_CONTROL
+    return resp
+
+class PlacePhoto(View):
+    # Plain async Django view (no DRF): public endpoint, and streaming needs the event loop.
+    async def get(self, request):
         key = _server_places_key()
         name = (request.GET.get("name") or "").strip()
         ref = (request.GET.get("ref") or "").strip()
         maxwidth = (request.GET.get("maxwidth") or "600").strip()
         maxheight = (request.GET.get("maxheight") or "400").strip()
+        stream = isinstance(request, ASGIRequest)
+
+        if name or ref:
+            etag = _photo_etag(name, ref, maxwidth, maxheight)
+            if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+                # browser already has this exact image: no upstream call at all
+                resp = HttpResponseNotModified()
+                resp["ETag"] = etag
+                resp["Cache-Control"] = PHOTO_CACHE_CONTROL
+                return resp
 
         if name:
             if not key:
@@ -149,19 +247,7 @@ class PlacePhoto(APIView):
                         if settings.DEBUG else HttpResponse(status=502))
             media_url = f"https://places.googleapis.com/v1/{name}/media"
             params = {"maxWidthPx": maxwidth, "maxHeightPx": maxheight, "key": key}
-            try:
-                with httpx.Client(timeout=15.0, follow_redirects=True) as c:
-                    r = c.get(media_url, params=params)
-            except Exception:
-                return HttpResponse(status=502)
-            ctype = r.headers.get("content-type", "")
-            if r.status_code != 200 or "image" not in ctype:
-                if settings.DEBUG:
-                    return JsonResponse({"status": r.status_code, "upstream": r.text}, status=502, safe=False)
-                return HttpResponse(status=502)
-            resp = HttpResponse(r.content, content_type=ctype)
-            resp["Cache-Control"] = "public, max-age=86400"
-            return resp
+            return await _proxy_image(media_url, params, etag=etag, stream=stream, debug_upstream=True)
 
         if ref:
             if not key:
@@ -169,14 +255,7 @@ class PlacePhoto(APIView):
                         if settings.DEBUG else HttpResponse(status=502))
             url = "https://maps.googleapis.com/maps/api/place/photo"
             params = {"photo_reference": ref, "maxwidth": maxwidth, "key": key}
-            with httpx.Client(timeout=15.0, follow_redirects=True) as c:
-                r = c.get(url, params=params)
-            ctype = r.headers.get("content-type", "")
-            if r.status_code != 200 or "image" not in ctype:
-                return HttpResponse(status=502)
-            resp = HttpResponse(r.content, content_type=ctype)
-            resp["Cache-Control"] = "public, max-age=86400"
-            return resp
+            return await _proxy_image(url, params, etag=etag, stream=stream)
 
         return HttpResponseBadRequest("Provide photo 'name' (v1) or 'ref' (legacy).")
 
@@ -186,57 +265,87 @@ class PropertyDetail(APIView):
 
     def get(self, request, place_id: str):
         try:
-            fields = [
-                "id","displayName","formattedAddress","location",
-                "googleMapsUri","websiteUri","rating","userRatingCount","photos",
-            ]
-            data = places.details_v1(place_id, fields)
+            data = places.details_v1(place_id, places.DETAILS_FIELDS)
             out = places.normalize_details_basic(data)
-            return Response(out)
+            return OrjsonResponse(out)
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
 
-NEARBY_TYPE_MAP: Dict[str, list] = {
-    "restaurants": ["restaurant", "cafe"],
-    "bars":        ["bar"],
-    "coffee":      ["cafe"],
-    "activities":  ["park", "movie_theater", "museum", "tourist_attraction"],
-    "shopping":    ["shopping_mall"],
-    "gyms":        ["gym"],
+MAX_DETAILS_BATCH = 50
+
+class PropertyDetailsBatch(APIView):
+    """
+    POST {"ids": [place_id, ...]} -> details for every card at once.
+    Lookups run concurrently instead of one /properties/<id>/ round-trip each.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, str) and i for i in ids):
+            return Response({"detail": "Expected {\"ids\": [place_id, ...]}."}, status=400)
+        if len(ids) > MAX_DETAILS_BATCH:
+            return Response({"detail": f"At most {MAX_DETAILS_BATCH} ids per batch."}, status=400)
+
+        fetched = async_to_sync(places.details_many_async)(ids, places.DETAILS_FIELDS)
+        results, errors = [], {}
+        for place_id, data in fetched.items():
+            if isinstance(data, places.PlacesError):
+                errors[place_id] = str(data)
+            else:
+                results.append(places.normalize_details_basic(data))
+        return OrjsonResponse({"results": results, "errors": errors})
+
+NEARBY_TYPE_MAP: Dict[str, frozenset] = {
+    "restaurants": frozenset({"restaurant", "cafe"}),
+    "bars":        frozenset({"bar"}),
+    "coffee":      frozenset({"cafe"}),
+    "activities":  frozenset({"park", "movie_theater", "museum", "tourist_attraction"}),
+    "shopping":    frozenset({"shopping_mall"}),
+    "gyms":        frozenset({"gym"}),
 }
 
+@lru_cache(maxsize=256)
+def _resolve_types(raw_types: Tuple[str, ...]) -> Tuple[str, ...]:
+    # The map UI resends the same filter bar over and over, so memoize the expansion.
+    # Union drops duplicates (restaurants+coffee -> one "cafe"); sorted so the
+    # request body, and with it the Places cache key, is stable across workers.
+    included = tuple(sorted(frozenset().union(*(NEARBY_TYPE_MAP.get(k, ()) for k in raw_types))))
+    # unknown categories pass through as raw Places types
+    return included or raw_types
+
 class NearbyAround(APIView):
     permission_classes = [AllowAny]
     authentication_classes = []
 
     def get(self, request):
+        qp = NearbyQuerySerializer(data=request.GET)
+        if not qp.is_valid():
+            return Response({"error": qp.errors}, status=400)
+        params = qp.validated_data
+        lat, lng, radius = params["lat"], params["lng"], params["radius"]
+        included_types = list(_resolve_types(tuple(params["types"])))
+
+        center = {"lat": lat, "lng": lng}
         try:
-            lat = float(request.GET.get("lat"))
-            lng = float(request.GET.get("lng"))
-        except (TypeError, ValueError):
-            return Response({"error": "lat/lng required"}, status=400)
-
-        radius = int(request.GET.get("radius", "1500"))
-        radius = max(200, min(radius, 5000))
-
-        raw_types = (request.GET.get("types") or "").lower().split(",")
-        raw_types = [t.strip() for t in raw_types if t.strip()]
-
-        included_types: list[str] = []
-        for key in raw_types:
-            included_types += NEARBY_TYPE_MAP.get(key, [])
-        if not included_types and raw_types:
-            included_types = raw_types
-
-        data = places.search_nearby_v1(
-            {"lat": lat, "lng": lng},
-            radius_m=radius,
-            included_types=included_types or None,
-            max_results=20,
-        )
+            data = places.search_nearby_v1(
+                center,
+                radius_m=radius,
+                included_types=included_types or None,
+                max_results=20,
+            )
+        except places.PlacesError as e:
+            # One unsupported type rejects the combined call; query the types
+            # concurrently one by one and keep whatever the API accepts.
+            if e.status_code != 400 or len(included_types) < 2:
+                raise
+            data = async_to_sync(places.search_nearby_per_type_async)(
+                center, radius_m=radius, included_types=included_types, max_results=20,
+            )
         items = data.get("places") or []
         results = [places.normalize_v1_place_basic(p) for p in items]
-        return Response({"results": results})
+        return _json_revalidated(request, {"results": results})
 
 
 # Debug-only helper: enqueue a canned agent command into the mailbox used by AgentCommandView
@@ -0,0 +1,21 @@
+# backend/voiceagent/_http.py
+import os
+import httpx
+
+from backend.agentcore.loops import PerLoop
+
+ELEVEN_API_KEY = os.environ.get("ELEVENLABS_API_KEY", "").strip()
+USER_AGENT = "speakspace/1.0"
+
+# ElevenLabs STT/TTS for the async voice view: pooled keep-alive client with the
+# api key set once, one per event loop (see PerLoop). No transport retries, so a
+# POST is never sent twice.
+ELEVEN_CLIENTS: PerLoop[httpx.AsyncClient] = PerLoop(
+    lambda: httpx.AsyncClient(
+        base_url="https://api.elevenlabs.io/v1",
+        headers={"xi-api-key": ELEVEN_API_KEY, "User-Agent": USER_AGENT},
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+    ),
+    close=httpx.AsyncClient.aclose,
+)
@@ -7,24 +7,24 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Protocol, List, Dict, Any, Optional
-import os
 import re
-import requests
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Built once at import. Keyword checks stay substring matches ("apartments"
+# hits "apartment", phrases like "close by" work) but run as one regex scan.
+_ZIP_RE = re.compile(r"\b(\d{5})\b")
+_PROPERTY_KEYWORDS = ("apartment", "condo", "house", "homes", "listings", "properties", "zip")
+_NEARBY_KEYWORDS = ("nearby", "around here", "close by", "this area")
+_PROPERTY_RE = re.compile("|".join(map(re.escape, _PROPERTY_KEYWORDS)), re.IGNORECASE)
+_NEARBY_RE = re.compile("|".join(map(re.escape, _NEARBY_KEYWORDS)), re.IGNORECASE)
+
 class ToolAgent(Protocol):
     name: str
     def can_handle(self, text: str) -> bool: ...
     def handle(self, text: str) -> Dict[str, Any]: ...
 
-def _public_base_url() -> str:
-    base = os.environ.get("PUBLIC_BASE_URL", "").rstrip("/")
-    if not base:
-        base = "http://127.0.0.1:8000"
-    return base
-
 def _broadcast(payload: Dict[str, Any]) -> None:
     try:
         from channels.layers import get_channel_layer  # type: ignore
@@ -40,47 +40,27 @@ def _broadcast(payload: Dict[str, Any]) -> None:
     )
 
 def _extract_zip_or_text(text: str) -> str:
-    m = re.search(r"\b(\d{5})\b", text)
+    m = _ZIP_RE.search(text)
     return m.group(1) if m else text.strip()
 
 class PropertiesSearchAgent:
     name = "properties.search"
 
     def can_handle(self, text: str) -> bool:
-        t = text.lower()
-        return any(k in t for k in (
-            "apartment", "apartments", "condo", "house", "homes",
-            "listings", "properties", "zip"
-        ))
+        return _PROPERTY_RE.search(text) is not None
 
     def handle(self, text: str) -> Dict[str, Any]:
-        q = _extract_zip_or_text(text)
-        base = _public_base_url()
-        url = f"{base}/api/properties/search/"
-
-        headers: Dict[str, str] = {}
-        # Optional: if you later protect the search API
-        search_bearer = os.environ.get("SEARCH_API_BEARER", "").strip()
-        if search_bearer:
-            headers["Authorization"] = f"Bearer {search_bearer}"
+        # deferred: keeps the bus importable without loading the mapapp view module
+        from mapapp.serializers import MODE_TEXT
+        from mapapp.views import search_properties
 
+        q = _extract_zip_or_text(text)
         try:
-            r = requests.get(
-                url,
-                params={"mode": "text", "q": q},
-                headers=headers or None,
-                timeout=15,
-            )
-            try:
-                data = r.json() if r.status_code == 200 else {"results": []}
-            except Exception:
-                data = {"results": []}
-            logger.info("search GET %s -> %s", r.url, r.status_code)
+            # in-process: same pipeline as GET /api/properties/search/?mode=text
+            items = search_properties(MODE_TEXT, q)
         except Exception as e:
-            logger.exception("search request failed: %s", e)
-            data = {"results": []}
-
-        items = data.get("results", []) or []
+            logger.exception("search failed: %s", e)
+            items = []
         count = len(items)
 
         _broadcast({"type": "navigate", "url": f"/dashboard?mode=text&q={q}"})
@@ -90,8 +70,7 @@ class NearbyAgent:
     name = "places.nearby"
 
     def can_handle(self, text: str) -> bool:
-        t = text.lower()
-        return any(k in t for k in ("nearby", "around here", "close by", "this area"))
+        return _NEARBY_RE.search(text) is not None
 
     def handle(self, text: str) -> Dict[str, Any]:
         return {"summary": "Okay—use the current map view to search this area."}
@@ -1,6 +1,6 @@
 # backend/voiceagent/consumers.py
 from channels.generic.websocket import AsyncWebsocketConsumer
-import json
+import orjson
 
 class AgentConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -14,7 +14,7 @@ class AgentConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data=None, bytes_data=None):
         # Minimal echo / stub behavior
         try:
-            payload = json.loads(text_data) if text_data else {}
+            payload = orjson.loads(text_data) if text_data else {}
         except Exception:
             payload = {"raw": text_data}
 
@@ -30,4 +30,5 @@ class AgentConsumer(AsyncWebsocketConsumer):
         return
 
     async def send_json(self, data):
-        await self.send(text_data=json.dumps(data))
+        # keep text frames (the FE JSON.parses event.data); orjson is only the encoder
+        await self.send(text_data=orjson.dumps(data).decode())
@@ -1,14 +1,16 @@
 # backend/voiceagent/tools.py
-import requests
+import httpx
+from mapapp.serializers import MODE_TEXT
+from mapapp.services.places import PlacesError
+from mapapp.views import search_properties
 
 def property_search_tool(query: str):
     """
-    Calls the PropertySearch API in text mode.
-    Example: query="Norfolk,VA" or query="24060"
+    Runs the PropertySearch text-mode search in-process and returns the same
+    payload as the API. Example: query="Norfolk,VA" or query="24060"
     """
-    resp = requests.get(
-        "http://127.0.0.1:8000/api/properties/search/",
-        params={"mode": "text", "q": query},
-        timeout=10,
-    )
-    return resp.json()
+    try:
+        results = search_properties(MODE_TEXT, (query or "").strip())
+    except (PlacesError, httpx.HTTPError) as e:
+        return {"results": [], "count": 0, "error": str(e)}
+    return {"results": results, "count": len(results)}
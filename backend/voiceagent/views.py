@@ -1,19 +1,22 @@
 # backend/voiceagent/views.py
 import os
-import base64
-import requests
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+import uuid
+import httpx
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.urls import reverse
+
+from mapapp.serializers import MODE_TEXT
+from mapapp.services.places import PlacesError
+from mapapp.views import search_properties
+from ._http import ELEVEN_API_KEY, ELEVEN_CLIENTS
 
-
-ELEVEN_API_KEY = os.environ.get("ELEVENLABS_API_KEY", "").strip()
 # Replace with your preferred ElevenLabs voice_id
 ELEVEN_VOICE_ID = os.environ.get("ELEVENLABS_VOICE_ID", "EXAVITQu4vr4xnSDxMaL").strip()
 
-# If you test via Vercel/production API instead of local, set this env var:
-# e.g. ELEVEN_AGENT_SEARCH_BASE_URL=https://your-app.vercel.app
-SEARCH_BASE = os.environ.get("ELEVEN_AGENT_SEARCH_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
+# Synthesized replies are parked in the cache just long enough for the FE to fetch them.
+TTS_AUDIO_TTL = 120
 
 
 def _missing_env_error():
@@ -30,55 +33,50 @@ def _missing_env_error():
     return None
 
 
-def transcribe_audio(file_obj) -> str:
+async def transcribe_audio(file_obj) -> str:
     """Send audio file to ElevenLabs STT and return transcribed text."""
-    resp = requests.post(
-        "https://api.elevenlabs.io/v1/speech-to-text",
-        headers={"xi-api-key": ELEVEN_API_KEY},
-        files={"file": file_obj},
-        timeout=30,
+    # Hand httpx the underlying file (BytesIO or on-disk temp file) so the
+    # multipart body is read and sent chunk by chunk rather than as one blob.
+    client = await ELEVEN_CLIENTS.get()
+    resp = await client.post(
+        "/speech-to-text",
+        files={"file": (file_obj.name, getattr(file_obj, "file", file_obj), getattr(file_obj, "content_type", None))},
     )
     resp.raise_for_status()
     data = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else {}
     return (data.get("text") or "").strip()
 
 
-def text_to_speech(text: str) -> str:
-    """Send text to ElevenLabs TTS and return base64-encoded MP3 (safe for JSON)."""
-    resp = requests.post(
-        f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVEN_VOICE_ID}",
-        headers={
-            "xi-api-key": ELEVEN_API_KEY,
-            "Content-Type": "application/json",
-        },
+async def text_to_speech_bytes(text: str) -> bytes:
+    """Send text to ElevenLabs TTS and return the raw MP3 bytes."""
+    client = await ELEVEN_CLIENTS.get()
+    resp = await client.post(
+        f"/text-to-speech/{ELEVEN_VOICE_ID}",
         json={
             "text": text,
             "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
         },
-        timeout=30,
     )
     resp.raise_for_status()
-    # Encode binary audio into base64 so we can send via JSON easily
-    return base64.b64encode(resp.content).decode("utf-8")
+    return resp.content
+
+
+async def store_tts_audio(request, audio: bytes) -> str:
+    """Cache the MP3 under a one-off token and return the absolute URL that serves it."""
+    token = uuid.uuid4().hex
+    await cache.aset(f"tts:{token}", audio, timeout=TTS_AUDIO_TTL)
+    return request.build_absolute_uri(reverse("voice_tts_audio", args=[token]))
 
 
-def property_search_http(query: str) -> dict:
+async def property_search(query: str) -> list[dict]:
     """
-    Calls your existing PropertySearch API in text mode:
-    GET /api/properties/search/?mode=text&q=<query>
+    Runs the PropertySearch pipeline in text mode, in-process (same results as
+    GET /api/properties/search/?mode=text&q=<query>, without the loopback HTTP hop).
     """
-    resp = requests.get(
-        f"{SEARCH_BASE}/api/properties/search/",
-        params={"mode": "text", "q": query},
-        timeout=30,
-    )
-    resp.raise_for_status()
-    return resp.json()
+    return await sync_to_async(search_properties)(MODE_TEXT, query.strip())
 
 
-@csrf_exempt
-@require_POST
-def agent_view(request):
+async def agent_view(request):
     """
     POST /api/voice/agent/
 
@@ -90,9 +88,13 @@ def agent_view(request):
         "query": "<transcribed text>",
         "results": [...],               // normalized property list from your API
         "response_text": "<what agent said>",
-        "response_audio": "<base64 mp3>" // may be null if TTS failed
+        "response_audio_url": "<url of mp3>" // may be null if TTS failed
       }
     """
+    # Django 4.2's require_POST/csrf_exempt don't wrap async views; check here
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
     # Basic env checks
     missing = _missing_env_error()
     if missing:
@@ -103,15 +105,14 @@ def agent_view(request):
 
     # 1) STT – transcribe speech
     try:
-        query_text = transcribe_audio(request.FILES["audio"])
-    except requests.RequestException as e:
+        query_text = await transcribe_audio(request.FILES["audio"])
+    except httpx.HTTPError as e:
         return JsonResponse({"error": f"STT failed: {e}"}, status=502)
 
     # 2) Call your existing PropertySearch API
     try:
-        payload = property_search_http(query_text or "apartments")
-        results = payload.get("results", [])
-    except requests.RequestException as e:
+        results = await property_search(query_text or "apartments")
+    except (PlacesError, httpx.HTTPError) as e:
         return JsonResponse(
             {"query": query_text, "results": [], "error": f"Search failed: {e}"},
             status=502,
@@ -130,17 +131,16 @@ def agent_view(request):
         response_text = f"Sorry, I couldn’t find apartments near {query_text or 'that query'}. Try another city or zip."
 
     # 4) TTS – synthesize speech (don’t fail the whole request if TTS errors)
-    response_audio_b64 = None
     try:
-        response_audio_b64 = text_to_speech(response_text)
-    except requests.RequestException as e:
+        audio = await text_to_speech_bytes(response_text)
+    except httpx.HTTPError as e:
         # partial success—frontend can still show results and text
         return JsonResponse(
             {
                 "query": query_text,
                 "results": results,
                 "response_text": response_text,
-                "response_audio": None,
+                "response_audio_url": None,
                 "tts_error": str(e),
             },
             status=206,
@@ -151,6 +151,22 @@ def agent_view(request):
             "query": query_text,
             "results": results,
             "response_text": response_text,
-            "response_audio": response_audio_b64,
+            "response_audio_url": await store_tts_audio(request, audio),
         }
     )
+
+agent_view.csrf_exempt = True  # multipart upload from the FE, no CSRF cookie
+
+
+async def tts_audio_view(request, token: str):
+    """
+    GET /api/voice/tts-audio/<token>/
+
+    Serves the MP3 produced by agent_view; tokens expire after TTS_AUDIO_TTL seconds.
+    """
+    audio = await cache.aget(f"tts:{token}")
+    if audio is None:
+        raise Http404("Audio expired or not found")
+    resp = HttpResponse(audio, content_type="audio/mpeg")
+    resp["Cache-Control"] = f"private, max-age={TTS_AUDIO_TTL}"
+    return resp
@@ -26,12 +26,7 @@ export default function VoiceSearch() {
       setQuery(data.query);
 
       // 🔊 Play back response audio
-      const audioBytes = Uint8Array.from(atob(data.response_audio), (c) =>
-        c.charCodeAt(0)
-      );
-      const audioBlob = new Blob([audioBytes], { type: "audio/mpeg" });
-      const audioUrl = URL.createObjectURL(audioBlob);
-      new Audio(audioUrl).play();
+      if (data.response_audio_url) new Audio(data.response_audio_url).play();
 
       // 🔹 Navigate to dashboard with mode+q
       navigate(`/dashboard?mode=text&q=${encodeURIComponent(data.query)}`);